@@ -87,17 +87,24 @@ accounts = [
 
 def bulk_insert_accounts():
     conn = get_connection()
+    conn.autocommit = False  # all rows in one transaction: one commit, one log flush
     cursor = conn.cursor()
-    sql = "INSERT INTO accounts (account_code, name, head) VALUES (%s, %s, %s)"
-    for name, code, head in accounts:
-        try:
-            cursor.execute(sql, (code, name, head))
-        except Exception as e:
-            print(f"Error inserting {code}: {e}")
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print("Bulk insert completed.")
+    # Existing codes are left as they are (no-op update) instead of failing the batch
+    sql = (
+        "INSERT INTO accounts (account_code, name, head) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE account_code = account_code"
+    )
+    try:
+        # executemany sends the INSERT as one multi-row statement
+        cursor.executemany(sql, [(code, name, head) for name, code, head in accounts])
+        conn.commit()
+        print(f"Bulk insert completed: {cursor.rowcount} new accounts.")
+    except Exception as e:
+        conn.rollback()
+        print(f"Bulk insert failed, nothing inserted: {e}")
+    finally:
+        cursor.close()
+        conn.close()
 
 if __name__ == "__main__":
     bulk_insert_accounts()
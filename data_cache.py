@@ -3,22 +3,72 @@ Data caching utility for Loan Dashboard
 Implements session state caching pattern for instant page navigation
 """
 
+import pandas as pd
 import streamlit as st
 from datetime import datetime
 import db
+import utils
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes (300 seconds)
+LOAN_DATE_COLS = [
+    "date_of_disbursement", "date_of_release", "expiry",
+    "last_intr_pay", "last_date_of_interest_deposit",
+]
+LOAN_NUMERIC_COLS = [
+    "loan_amount", "pending_loan_amount", "interest_amount", "interest_rate",
+    "gross_wt", "net_wt", "gold_rate", "purity", "valuation", "ltv_given",
+    "interest_deposited_till_date",
+]
+
+
+def _normalize_loan_types(loan_df):
+    """
+    Normalize loan column types once at load time:
+    - date columns -> datetime64
+    - amount/weight columns -> numeric (NaN kept; pages choose the fill)
+    - 'customer_type' -> title-cased category (two values, stored as int codes)
+    - 'customer_name' -> category (group with observed=True)
+    - 'released' -> category via utils.normalize_released, plus 'released_bool'
+    
+    Pages can then filter with plain masks instead of per-row string work.
+    """
+    for col in LOAN_DATE_COLS:
+        if col in loan_df.columns:
+            loan_df[col] = pd.to_datetime(loan_df[col], errors='coerce')
+    
+    for col in LOAN_NUMERIC_COLS:
+        if col in loan_df.columns:
+            loan_df[col] = pd.to_numeric(loan_df[col], errors='coerce')
+    
+    if 'customer_type' in loan_df.columns:
+        loan_df['customer_type'] = loan_df['customer_type'].str.title().astype('category')
+    
+    if 'customer_name' in loan_df.columns:
+        # Names repeat across a customer's loans; codes make groupby keys cheap
+        loan_df['customer_name'] = loan_df['customer_name'].astype('category')
+    
+    if 'released' in loan_df.columns:
+        released = utils.normalize_released(loan_df['released'])
+        loan_df['released'] = released.astype('category')
+        loan_df['released_bool'] = released.eq('TRUE')
+    
+    return loan_df
+
+
+@st.cache_data(ttl=300, show_spinner="Loading loans...")  # Cache for 5 minutes
 def _fetch_loan_data_from_db():
     """
     Internal function to fetch loan data from database.
     Cached using Streamlit's @st.cache_data decorator.
     This cache persists across sessions and page refreshes!
     
+    Column types are normalized once here (see _normalize_loan_types), so
+    every session shares the typed frame.
+    
     Returns:
         pd.DataFrame: Loan data from database
     """
-    return db.get_all_loans()
+    return _normalize_loan_types(db.get_all_loans())
 
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes (300 seconds)
@@ -64,6 +114,35 @@ def load_loan_data_with_cache():
     return st.session_state.loan_data
 
 
+def load_derived_loan_data(cache_key, builder):
+    """
+    Build a DataFrame derived from the loan data once per loan-data load.
+    
+    The result is kept in session state next to the loan data and is only
+    rebuilt when the loan data itself is reloaded (new loan_data_loaded_at),
+    so page reruns and navigation reuse it.
+    
+    Args:
+        cache_key (str): Session state key for the derived data
+        builder (callable): Function taking the loan DataFrame
+    
+    Returns:
+        Result of builder(loan_df), cached
+    
+    Example:
+        yield_df = load_derived_loan_data('yield_data', prepare_yield_data)
+    """
+    loan_df = load_loan_data_with_cache()
+    source_key = f'{cache_key}_source'
+    loaded_at = st.session_state.loan_data_loaded_at
+    
+    if st.session_state.get(source_key) != loaded_at:
+        st.session_state[cache_key] = builder(loan_df)
+        st.session_state[source_key] = loaded_at
+    
+    return st.session_state[cache_key]
+
+
 def load_expense_data_with_cache():
     """
     Load expense data with dual-layer caching:
@@ -23,7 +23,15 @@ URL = (
     f"{os.getenv('MYSQL_USER')}:{os.getenv('MYSQL_PASS')}"
     f"@{os.getenv('MYSQL_HOST')}:{os.getenv('MYSQL_PORT')}/{os.getenv('MYSQL_DB')}"
 )
-engine = create_engine(URL, pool_pre_ping=True)
+# Built once per process (module import), so every Streamlit rerun and
+# session shares this pool; no st.cache_resource wrapper is needed
+engine = create_engine(
+    URL,
+    pool_size=10,
+    max_overflow=5,
+    pool_pre_ping=True,
+    pool_recycle=1800,  # seconds; stay under MySQL's idle wait_timeout
+)
 
 # Create a SessionLocal class for database interactions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -176,18 +184,16 @@ def calculate_realized_interest(df):
     Returns:
         pandas.Series: realized_interest for each loan
     """
-    # Initialize with interest_deposited_till_date (actual paid)
-    realized = df['interest_deposited_till_date'].copy()
+    deposited = df['interest_deposited_till_date']
     
-    # For released loans with missing/zero deposited interest, use interest_amount (fallback)
-    legacy_mask = (df['released'] == 'TRUE') & (
-        df['interest_deposited_till_date'].isna() | 
-        (df['interest_deposited_till_date'] <= 0)
-    )
+    # Loader-normalized frames carry a boolean flag; fall back to the string
+    released = df['released_bool'] if 'released_bool' in df.columns else df['released'] == 'TRUE'
     
-    realized.loc[legacy_mask] = df.loc[legacy_mask, 'interest_amount']
+    # For released loans with missing/zero deposited interest, use interest_amount (fallback)
+    legacy_mask = released & (deposited.isna() | (deposited <= 0))
     
-    return realized
+    # Otherwise interest_deposited_till_date (actual paid)
+    return deposited.mask(legacy_mask, df['interest_amount'])
 
 
 def calculate_correct_ltv(df):
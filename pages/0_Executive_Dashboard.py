@@ -13,7 +13,7 @@ import numpy as np
 import calendar
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from db import calculate_correct_ltv
+from db import calculate_correct_ltv, calculate_realized_interest
 
 st.set_page_config(page_title="Executive Dashboard", layout="wide", initial_sidebar_state="expanded")
 
@@ -62,6 +62,49 @@ st.markdown("""
 st.title("📊 Executive Dashboard")
 st.markdown("*Real-time portfolio insights and performance metrics*")
 
+
+def histogram_bins(values, nbins):
+    """
+    Bin counts and edges for a numeric Series, as hashable tuples.
+    
+    The cached figure builder is keyed on these instead of the raw Series,
+    so Streamlit hashes nbins + 1 numbers rather than every loan row.
+    """
+    counts, edges = np.histogram(values.dropna(), bins=nbins)
+    return tuple(counts.tolist()), tuple(edges.tolist())
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_distribution_histogram(counts, edges, mean, median, title, axis_label, color):
+    """
+    Build a histogram with mean/median markers from precomputed bins
+    (see histogram_bins).
+    
+    Only the figure is cached; st.plotly_chart is still called by the page.
+    """
+    edges = np.asarray(edges)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color=color
+    ))
+    
+    fig.add_vline(x=mean, line_dash="dash", line_color="red", annotation_text="Mean")
+    fig.add_vline(x=median, line_dash="dash", line_color="green", annotation_text="Median")
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title=axis_label,
+        yaxis_title='Frequency',
+        bargap=0,
+        template='plotly_white',
+        height=350,
+        showlegend=False
+    )
+    return fig
+
+
 # ---- SIDEBAR: Filters and Controls ----
 with st.sidebar:
     st.markdown("### 🎯 Dashboard Controls")
@@ -123,16 +166,9 @@ try:
         st.stop()
     
     # Data preprocessing
-    num_cols = ["loan_amount", "pending_loan_amount", "interest_amount", "interest_rate", 
-                "gross_wt", "net_wt", "gold_rate", "purity", "valuation", "ltv_given",
-                "interest_deposited_till_date"]
-    
-    for col in num_cols:
-        if col in loan_df.columns:
-            loan_df[col] = pd.to_numeric(loan_df[col], errors="coerce").fillna(0)
-    
-    loan_df["date_of_disbursement"] = pd.to_datetime(loan_df["date_of_disbursement"], errors='coerce')
-    loan_df["date_of_release"] = pd.to_datetime(loan_df["date_of_release"], errors='coerce')
+    # Types are set by the cached loader; this only fills missing values
+    utils.ensure_numeric_columns(loan_df, data_cache.LOAN_NUMERIC_COLS)
+    utils.ensure_datetime_columns(loan_df, ["date_of_disbursement", "date_of_release", "expiry"])
     
     # Normalize customer data using utils
     loan_df = utils.normalize_customer_data(loan_df)
@@ -199,8 +235,8 @@ try:
         period_label = "All Time"
         prev_period_label = "All Time"
     
-    # Apply filters
-    filtered_df = loan_df.copy()
+    # Apply filters (each filter builds a new frame, so loan_df is not copied up front)
+    filtered_df = loan_df
     
     # Customer type filter
     if customer_type_filter:
@@ -208,9 +244,9 @@ try:
     
     # Loan status filter
     if loan_status_filter == "Active Only":
-        filtered_df = filtered_df[filtered_df['released'] == 'FALSE']
+        filtered_df = filtered_df[~filtered_df['released_bool']]
     elif loan_status_filter == "Released Only":
-        filtered_df = filtered_df[filtered_df['released'] == 'TRUE']
+        filtered_df = filtered_df[filtered_df['released_bool']]
     
     # Amount filter
     if min_amount > 0:
@@ -228,18 +264,27 @@ try:
         (filtered_df['date_of_disbursement'] <= prev_period_end)
     ]
     
+    # Active (unreleased) loans, materialized once and reused by later sections
+    active_mask = ~filtered_df['released_bool']
+    active_df = filtered_df[active_mask]
+    # Loan age is computed per render so it never lags the cached loan data
+    active_days = (pd.Timestamp.now().normalize() - active_df['date_of_disbursement']).dt.days
+    
     # Calculate current period metrics
-    total_disbursed = current_period_df['loan_amount'].sum()
-    total_outstanding = filtered_df[filtered_df['released'] == 'FALSE']['pending_loan_amount'].sum()
-    total_interest = current_period_df['interest_amount'].sum()
+    # Amount/interest totals reduced together in one pass per period
+    current_totals = current_period_df[['loan_amount', 'interest_amount']].sum()
+    total_disbursed = current_totals['loan_amount']
+    total_outstanding = active_df['pending_loan_amount'].sum()
+    total_interest = current_totals['interest_amount']
     loan_count = len(current_period_df)
-    active_loans = len(filtered_df[filtered_df['released'] == 'FALSE'])
-    avg_loan_size = current_period_df['loan_amount'].mean() if loan_count > 0 else 0
-    active_customers = filtered_df[filtered_df['released'] == 'FALSE']['customer_name'].nunique()
+    active_loans = int(active_mask.sum())
+    avg_loan_size = total_disbursed / loan_count if loan_count > 0 else 0
+    active_customers = active_df['customer_name'].nunique()
     
     # Calculate previous period metrics
-    prev_disbursed = prev_period_df['loan_amount'].sum()
-    prev_interest = prev_period_df['interest_amount'].sum()
+    prev_totals = prev_period_df[['loan_amount', 'interest_amount']].sum()
+    prev_disbursed = prev_totals['loan_amount']
+    prev_interest = prev_totals['interest_amount']
     prev_loan_count = len(prev_period_df)
     
     # Calculate growth percentages
@@ -280,28 +325,21 @@ try:
         # Always calculate from March 1, 2020 to current period end
         fixed_start_date = pd.Timestamp('2020-03-01')
         
-        # Get all released loans from March 1, 2020 to period end
-        released_in_period = filtered_df[
-            (filtered_df['date_of_release'] >= fixed_start_date) &
-            (filtered_df['date_of_release'] <= period_end) &
-            (filtered_df['released'] == 'TRUE')
-        ].copy()
-        
         # For released loans: Use higher of interest_amount or interest_deposited_till_date
-        if not released_in_period.empty:
-            released_in_period['legacy_interest'] = released_in_period.apply(
-                lambda row: max(row['interest_amount'], row['interest_deposited_till_date']),
-                axis=1
-            )
-            interest_from_released = released_in_period['legacy_interest'].sum()
-        else:
-            interest_from_released = 0
+        legacy_interest = np.maximum(
+            filtered_df['interest_amount'], filtered_df['interest_deposited_till_date']
+        )
+        released_since_start = (
+            filtered_df['released_bool'] & (filtered_df['date_of_release'] >= fixed_start_date)
+        )
+        
+        # Released loans from March 1, 2020 to period end (mask only, no subset frame)
+        interest_from_released = legacy_interest[
+            released_since_start & (filtered_df['date_of_release'] <= period_end)
+        ].sum()
         
         # For active loans (released = FALSE): Use interest_deposited_till_date
-        active_with_interest = filtered_df[
-            (filtered_df['released'] == 'FALSE') &
-            (filtered_df['interest_deposited_till_date'] > 0)
-        ].copy()
+        active_with_interest = active_df[active_df['interest_deposited_till_date'] > 0]
         
         interest_from_active = active_with_interest['interest_deposited_till_date'].sum()
         
@@ -309,27 +347,12 @@ try:
         total_interest = interest_from_released + interest_from_active
         
         # Previous period calculation (same logic for comparison)
-        prev_released = filtered_df[
-            (filtered_df['date_of_release'] >= fixed_start_date) &
-            (filtered_df['date_of_release'] <= prev_period_end) &
-            (filtered_df['released'] == 'TRUE')
-        ].copy()
-        
-        if not prev_released.empty:
-            prev_released['legacy_interest'] = prev_released.apply(
-                lambda row: max(row['interest_amount'], row['interest_deposited_till_date']),
-                axis=1
-            )
-            prev_interest_from_released = prev_released['legacy_interest'].sum()
-        else:
-            prev_interest_from_released = 0
-        
-        prev_active_with_interest = filtered_df[
-            (filtered_df['released'] == 'FALSE') &
-            (filtered_df['interest_deposited_till_date'] > 0)
-        ].copy()
+        prev_interest_from_released = legacy_interest[
+            released_since_start & (filtered_df['date_of_release'] <= prev_period_end)
+        ].sum()
         
-        prev_interest_from_active = prev_active_with_interest['interest_deposited_till_date'].sum()
+        # Active deposits are not period-bound, so the previous period uses the same total
+        prev_interest_from_active = interest_from_active
         prev_interest = prev_interest_from_released + prev_interest_from_active
         
         interest_growth = ((total_interest - prev_interest) / prev_interest * 100) if prev_interest > 0 else 0
@@ -361,13 +384,13 @@ try:
     st.markdown("## 🏥 Portfolio Health Dashboard")
     
     # Calculate health scores
-    avg_ltv = filtered_df[filtered_df['released'] == 'FALSE']['ltv_given'].mean()
+    avg_ltv = active_df['ltv_given'].mean()
     ltv_health = min(100, max(0, 100 - abs(75 - avg_ltv) * 2))  # Optimal LTV around 75%
     
     # Adjusted Collection Efficiency: Include legacy released loans where deposit data is missing
     # Logic: Sum of interest_deposited_till_date + (interest_amount for released loans where deposited is 0)
     total_deposited = filtered_df['interest_deposited_till_date'].sum()
-    legacy_released_mask = (filtered_df['released'] == 'TRUE') & (filtered_df['interest_deposited_till_date'] <= 0)
+    legacy_released_mask = filtered_df['released_bool'] & (filtered_df['interest_deposited_till_date'] <= 0)
     legacy_recovered_interest = filtered_df.loc[legacy_released_mask, 'interest_amount'].sum()
     total_collected_adjusted = total_deposited + legacy_recovered_interest
     
@@ -376,10 +399,8 @@ try:
     collection_health = min(100, collection_efficiency)
     
     # Diversification: lower concentration = better
-    active_df = filtered_df[filtered_df['released'] == 'FALSE']
     if len(active_df) > 0:
-        top_5_concentration = (active_df.nlargest(5, 'pending_loan_amount')['pending_loan_amount'].sum() / 
-                              active_df['pending_loan_amount'].sum() * 100)
+        top_5_concentration = utils.calculate_top_n_concentration(active_df['pending_loan_amount'], n=5)
         diversification_health = max(0, 100 - top_5_concentration)
     else:
         diversification_health = 100
@@ -552,11 +573,9 @@ try:
     
     # Check for loans approaching maturity (if expiry date is available)
     if 'expiry' in filtered_df.columns:
-        filtered_df['expiry'] = pd.to_datetime(filtered_df['expiry'], errors='coerce')
-        upcoming_maturity = filtered_df[
-            (filtered_df['released'] == 'FALSE') &
-            (filtered_df['expiry'].notna()) &
-            (filtered_df['expiry'] <= datetime.now() + timedelta(days=7))
+        upcoming_maturity = active_df[
+            (active_df['expiry'].notna()) &
+            (active_df['expiry'] <= datetime.now() + timedelta(days=7))
         ]
         if len(upcoming_maturity) > 0:
             insights.append(("🟡", "Action", f"{len(upcoming_maturity)} loans maturing in next 7 days"))
@@ -604,11 +623,11 @@ try:
     st.markdown("## 🏆 Top 10 Customers by Outstanding Amount")
     st.caption("*Outstanding = Pending Loan Amount for active (unreleased) loans only*")
     
-    top_customers = filtered_df[filtered_df['released'] == 'FALSE'].groupby('customer_name').agg({
+    top_customers = active_df.groupby('customer_name', observed=True).agg({
         'pending_loan_amount': 'sum',
         'loan_number': 'count',
         'customer_type': 'first'
-    }).sort_values('pending_loan_amount', ascending=False).head(10)
+    }).nlargest(10, 'pending_loan_amount')
     
     if not top_customers.empty:
         top_customers = top_customers.reset_index()
@@ -643,12 +662,13 @@ try:
         # Summary table
         col1, col2 = st.columns([3, 1])
         with col1:
-            styled_top = utils.style_mixed_table(
-                top_customers,
-                currency_cols=['Outstanding (₹)'],
-                int_cols=['Active Loans']
+            st.dataframe(
+                top_customers, use_container_width=True, hide_index=True,
+                column_config=utils.mixed_column_config(
+                    currency_cols=['Outstanding (₹)'],
+                    int_cols=['Active Loans']
+                )
             )
-            st.dataframe(styled_top, use_container_width=True, hide_index=True)
         with col2:
             total_top10 = top_customers['Outstanding (₹)'].sum()
             concentration = (total_top10 / total_outstanding * 100) if total_outstanding > 0 else 0
@@ -665,12 +685,10 @@ try:
     st.markdown("## 🚨 Aged Items Alert")
     
     # Only analyze active (unreleased) loans
-    active_loans_df = filtered_df[filtered_df['released'] == 'FALSE'].copy()
+    active_loans_df = active_df.copy()
     
     if len(active_loans_df) > 0:
-        # Calculate days since disbursement
-        now = pd.Timestamp(datetime.now())
-        active_loans_df['days_since_disbursement'] = (now - pd.to_datetime(active_loans_df['date_of_disbursement'])).dt.days
+        active_loans_df['days_since_disbursement'] = active_days
         active_loans_df['months_since_disbursement'] = active_loans_df['days_since_disbursement'] / 30.44
         
         # Calculate correct LTV
@@ -683,18 +701,18 @@ try:
         private_aged = active_loans_df[
             (active_loans_df['customer_type'] == 'Private') & 
             (active_loans_df['days_since_disbursement'] > 365)
-        ].copy()
+        ]
         
         # Criteria 2: Vyapari clients older than 730 days
         vyapari_aged = active_loans_df[
             (active_loans_df['customer_type'] == 'Vyapari') & 
             (active_loans_df['days_since_disbursement'] > 730)
-        ].copy()
+        ]
         
         # Criteria 3: Payment overdue (equity remaining < 1.25%)
         payment_overdue = active_loans_df[
             active_loans_df['equity_remaining'] < 1.25
-        ].copy()
+        ]
         
         # Summary metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -737,6 +755,13 @@ try:
         if len(private_aged) > 0 or len(vyapari_aged) > 0 or len(payment_overdue) > 0:
             st.markdown("### 📋 Detailed Breakdown")
             
+            # Formatted client-side from raw numbers (no Styler pass over every row)
+            aged_column_config = utils.mixed_column_config(
+                currency_cols=['Original (₹)', 'Outstanding (₹)'],
+                pct_cols=['LTV (%)', 'Equity Remaining (%)'],
+                int_cols=['Age (Days)']
+            )
+            
             tab1, tab2, tab3 = st.tabs([
                 f"🟡 Private Aged ({len(private_aged)})",
                 f"🟠 Vyapari Aged ({len(vyapari_aged)})",
@@ -749,7 +774,7 @@ try:
                         'loan_number', 'customer_name', 'loan_amount', 
                         'pending_loan_amount', 'days_since_disbursement', 
                         'ltv_correct', 'equity_remaining'
-                    ]].copy()
+                    ]]
                     
                     display_df.columns = [
                         'Loan #', 'Customer', 'Original (₹)', 
@@ -758,13 +783,8 @@ try:
                     
                     display_df = display_df.sort_values('Age (Days)', ascending=False)
                     
-                    styled_display = utils.style_mixed_table(
-                        display_df,
-                        currency_cols=['Original (₹)', 'Outstanding (₹)'],
-                        int_cols=['Age (Days)'],
-                        pct_cols=['LTV (%)', 'Equity Remaining (%)']
-                    )
-                    st.dataframe(styled_display, use_container_width=True, hide_index=True)
+                    st.dataframe(display_df, use_container_width=True, hide_index=True,
+                                 column_config=aged_column_config)
                 else:
                     st.success("✅ No private loans aged beyond 365 days")
             
@@ -774,7 +794,7 @@ try:
                         'loan_number', 'customer_name', 'loan_amount', 
                         'pending_loan_amount', 'days_since_disbursement', 
                         'ltv_correct', 'equity_remaining'
-                    ]].copy()
+                    ]]
                     
                     display_df.columns = [
                         'Loan #', 'Customer', 'Original (₹)', 
@@ -783,13 +803,8 @@ try:
                     
                     display_df = display_df.sort_values('Age (Days)', ascending=False)
                     
-                    styled_display = utils.style_mixed_table(
-                        display_df,
-                        currency_cols=['Original (₹)', 'Outstanding (₹)'],
-                        int_cols=['Age (Days)'],
-                        pct_cols=['LTV (%)', 'Equity Remaining (%)']
-                    )
-                    st.dataframe(styled_display, use_container_width=True, hide_index=True)
+                    st.dataframe(display_df, use_container_width=True, hide_index=True,
+                                 column_config=aged_column_config)
                 else:
                     st.success("✅ No vyapari loans aged beyond 730 days")
             
@@ -799,7 +814,7 @@ try:
                         'loan_number', 'customer_name', 'customer_type',
                         'loan_amount', 'pending_loan_amount', 
                         'days_since_disbursement', 'ltv_correct', 'equity_remaining'
-                    ]].copy()
+                    ]]
                     
                     display_df.columns = [
                         'Loan #', 'Customer', 'Type',
@@ -809,13 +824,8 @@ try:
                     
                     display_df = display_df.sort_values('Equity Remaining (%)', ascending=True)
                     
-                    styled_display = utils.style_mixed_table(
-                        display_df,
-                        currency_cols=['Original (₹)', 'Outstanding (₹)'],
-                        int_cols=['Age (Days)'],
-                        pct_cols=['LTV (%)', 'Equity Remaining (%)']
-                    )
-                    st.dataframe(styled_display, use_container_width=True, hide_index=True)
+                    st.dataframe(display_df, use_container_width=True, hide_index=True,
+                                 column_config=aged_column_config)
                     
                     st.warning("""
                     ⚠️ **Payment Overdue Explanation**: These loans have equity remaining < 1.25%. 
@@ -839,6 +849,9 @@ try:
     st.markdown("---")
     st.markdown("## 📊 Granular Portfolio Metrics")
     
+    # Released-loan subset shared by the Interest and Time tabs (filtered once)
+    released_loans_df = filtered_df[filtered_df['date_of_release'].notna()]
+    
     # Create tabs for different metric categories
     tab1, tab2, tab3, tab4 = st.tabs(["💰 Loan Size Metrics", "💵 Interest Metrics", "⏱️ Time Metrics", "🏆 Customer Metrics"])
     
@@ -866,19 +879,11 @@ try:
             st.metric("Std Dev", f"₹{std_loan:,.0f}", f"CV: {cv:.1f}%")
         
         # Loan size distribution histogram
-        fig = px.histogram(
-            filtered_df,
-            x='loan_amount',
-            nbins=30,
-            title="Loan Amount Distribution",
-            labels={'loan_amount': 'Loan Amount (₹)', 'count': 'Frequency'},
-            color_discrete_sequence=['#3b82f6']
+        counts, edges = histogram_bins(filtered_df['loan_amount'], 30)
+        fig = build_distribution_histogram(
+            counts, edges, avg_loan, median_loan, "Loan Amount Distribution",
+            'Loan Amount (₹)', '#3b82f6'
         )
-        
-        fig.add_vline(x=avg_loan, line_dash="dash", line_color="red", annotation_text="Mean")
-        fig.add_vline(x=median_loan, line_dash="dash", line_color="green", annotation_text="Median")
-        
-        fig.update_layout(template='plotly_white', height=350, showlegend=False)
         st.plotly_chart(fig, use_container_width=True)
         
         # Percentile breakdown
@@ -903,7 +908,7 @@ try:
         
         # Filter for last 12 months
         twelve_months_ago = pd.Timestamp.now() - pd.DateOffset(months=12)
-        last_12m_df = filtered_df[filtered_df['date_of_disbursement'] >= twelve_months_ago].copy()
+        last_12m_df = filtered_df[filtered_df['date_of_disbursement'] >= twelve_months_ago]
         
         if not last_12m_df.empty:
             col1, col2, col3, col4 = st.columns(4)
@@ -936,8 +941,8 @@ try:
             
             # Monthly trend for last 12 months
             st.markdown("#### Monthly Loan Size Trend (Last 12 Months)")
-            last_12m_df['month_year'] = last_12m_df['date_of_disbursement'].dt.to_period('M').astype(str)
-            monthly_trend = last_12m_df.groupby('month_year').agg({
+            month_year = last_12m_df['date_of_disbursement'].dt.to_period('M').astype(str)
+            monthly_trend = last_12m_df.groupby(month_year).agg({
                 'loan_amount': ['mean', 'sum', 'count']
             }).reset_index()
             monthly_trend.columns = ['Month', 'Avg Loan Size', 'Total Disbursed', 'Count']
@@ -965,13 +970,14 @@ try:
     with tab2:
         st.markdown("### Interest Earnings Analysis")
         
-        # Filter for released loans (interest is realized on release)
-        interest_df = filtered_df[filtered_df['date_of_release'].notna()].copy()
+        # Released loans (interest is realized on release)
+        interest_df = released_loans_df
         
         # Calculate realized_interest using correct formula
         if not interest_df.empty:
-            from db import calculate_realized_interest
-            interest_df['realized_interest'] = calculate_realized_interest(interest_df)
+            interest_df = interest_df.assign(
+                realized_interest=calculate_realized_interest(interest_df)
+            )
         
         if not interest_df.empty:
             col1, col2, col3, col4 = st.columns(4)
@@ -1026,12 +1032,13 @@ try:
             
             with col1:
                 # Display table
-                styled_range = utils.style_mixed_table(
-                    range_summary,
-                    currency_cols=['Total Interest (₹)', 'Avg Interest (₹)'],
-                    int_cols=['Count']
+                st.dataframe(
+                    range_summary, use_container_width=True, hide_index=True,
+                    column_config=utils.mixed_column_config(
+                        currency_cols=['Total Interest (₹)', 'Avg Interest (₹)'],
+                        int_cols=['Count']
+                    )
                 )
-                st.dataframe(styled_range, use_container_width=True, hide_index=True)
             
             with col2:
                 # Bar chart for visual distribution
@@ -1065,12 +1072,13 @@ try:
                 ).round(0)
                 interest_by_type.columns = ['Avg Interest', 'Median Interest', 'Total Interest', 'Count']
                 
-                styled_interest = utils.style_mixed_table(
-                    interest_by_type,
-                    currency_cols=['Avg Interest', 'Median Interest', 'Total Interest'],
-                    int_cols=['Count']
+                st.dataframe(
+                    interest_by_type, use_container_width=True,
+                    column_config=utils.mixed_column_config(
+                        currency_cols=['Avg Interest', 'Median Interest', 'Total Interest'],
+                        int_cols=['Count']
+                    )
                 )
-                st.dataframe(styled_interest, use_container_width=True)
         else:
             st.info("No released loans with interest data available")
         
@@ -1082,7 +1090,7 @@ try:
             
             # Filter for last 12 months releases
             twelve_months_ago = pd.Timestamp.now() - pd.DateOffset(months=12)
-            last_12m_interest = interest_df[interest_df['date_of_release'] >= twelve_months_ago].copy()
+            last_12m_interest = interest_df[interest_df['date_of_release'] >= twelve_months_ago]
             
             if not last_12m_interest.empty:
                 col1, col2, col3, col4 = st.columns(4)
@@ -1116,8 +1124,8 @@ try:
                 
                 # Monthly interest trend
                 st.markdown("#### Monthly Interest Earnings (Last 12 Months)")
-                last_12m_interest['month_year'] = last_12m_interest['date_of_release'].dt.to_period('M').astype(str)
-                monthly_interest = last_12m_interest.groupby('month_year').agg({
+                month_year = last_12m_interest['date_of_release'].dt.to_period('M').astype(str)
+                monthly_interest = last_12m_interest.groupby(month_year).agg({
                     'realized_interest': ['mean', 'sum', 'count']
                 }).reset_index()
                 monthly_interest.columns = ['Month', 'Avg Interest', 'Total Interest', 'Count']
@@ -1173,12 +1181,12 @@ try:
         st.markdown("### Time-Based Performance Metrics")
         
         # Calculate time to release for completed loans
-        released_loans = filtered_df[filtered_df['date_of_release'].notna()].copy()
+        released_loans = released_loans_df
         
         if not released_loans.empty:
-            released_loans['days_to_release'] = (
+            released_loans = released_loans.assign(days_to_release=(
                 released_loans['date_of_release'] - released_loans['date_of_disbursement']
-            ).dt.days
+            ).dt.days)
             
             # Remove negative or zero values (data errors)
             released_loans = released_loans[released_loans['days_to_release'] > 0]
@@ -1206,19 +1214,11 @@ try:
                     st.metric("Released ≤30 Days", f"{quick_pct:.1f}%", f"{quick_releases} loans")
                 
                 # Time distribution
-                fig = px.histogram(
-                    released_loans,
-                    x='days_to_release',
-                    nbins=40,
-                    title="Distribution of Days to Release",
-                    labels={'days_to_release': 'Days to Release', 'count': 'Frequency'},
-                    color_discrete_sequence=['#8b5cf6']
+                counts, edges = histogram_bins(released_loans['days_to_release'], 40)
+                fig = build_distribution_histogram(
+                    counts, edges, avg_days, median_days, "Distribution of Days to Release",
+                    'Days to Release', '#8b5cf6'
                 )
-                
-                fig.add_vline(x=avg_days, line_dash="dash", line_color="red", annotation_text="Mean")
-                fig.add_vline(x=median_days, line_dash="dash", line_color="green", annotation_text="Median")
-                
-                fig.update_layout(template='plotly_white', height=350, showlegend=False)
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Time brackets
@@ -1254,30 +1254,29 @@ try:
                     st.plotly_chart(fig, use_container_width=True)
                 
                 with col2:
-                    styled_time = utils.style_mixed_table(
-                        time_summary,
-                        currency_cols=['Total Principal', 'Total Interest'],
-                        int_cols=['Loan Count'],
-                        pct_cols=['% of Total']
+                    st.dataframe(
+                        time_summary, use_container_width=True, hide_index=True, height=300,
+                        column_config=utils.mixed_column_config(
+                            currency_cols=['Total Principal', 'Total Interest'],
+                            int_cols=['Loan Count'],
+                            pct_cols=['% of Total']
+                        )
                     )
-                    st.dataframe(styled_time, use_container_width=True, hide_index=True, height=300)
                 
                 # Active loan duration for unreleased loans
                 st.markdown("#### Active Loan Duration (Unreleased)")
-                active_loans_time = filtered_df[filtered_df['released'] == 'FALSE'].copy()
+                days_active = active_days
                 
-                if not active_loans_time.empty:
-                    active_loans_time['days_active'] = (pd.Timestamp.now() - pd.to_datetime(active_loans_time['date_of_disbursement'])).dt.days
-                    
+                if not days_active.empty:
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        avg_active = active_loans_time['days_active'].mean()
+                        avg_active = days_active.mean()
                         st.metric("Avg Days Active", f"{avg_active:.0f} days")
                     with col2:
-                        median_active = active_loans_time['days_active'].median()
+                        median_active = days_active.median()
                         st.metric("Median Days Active", f"{median_active:.0f} days")
                     with col3:
-                        long_active = (active_loans_time['days_active'] > 365).sum()
+                        long_active = (days_active > 365).sum()
                         st.metric("Active >365 Days", f"{long_active} loans")
                 
                 # Last 12 Months Time Metrics
@@ -1287,7 +1286,7 @@ try:
                 
                 # Filter for last 12 months releases
                 twelve_months_ago = pd.Timestamp.now() - pd.DateOffset(months=12)
-                last_12m_released = released_loans[released_loans['date_of_release'] >= twelve_months_ago].copy()
+                last_12m_released = released_loans[released_loans['date_of_release'] >= twelve_months_ago]
                 
                 if not last_12m_released.empty:
                     col1, col2, col3, col4 = st.columns(4)
@@ -1318,8 +1317,8 @@ try:
                     
                     # Monthly trend for average days to release
                     st.markdown("#### Monthly Average Days to Release (Last 12 Months)")
-                    last_12m_released['release_month'] = last_12m_released['date_of_release'].dt.to_period('M').astype(str)
-                    monthly_time = last_12m_released.groupby('release_month').agg({
+                    release_month = last_12m_released['date_of_release'].dt.to_period('M').astype(str)
+                    monthly_time = last_12m_released.groupby(release_month).agg({
                         'days_to_release': ['mean', 'median', 'count']
                     }).reset_index()
                     monthly_time.columns = ['Month', 'Avg Days', 'Median Days', 'Count']
@@ -1361,14 +1360,13 @@ try:
         st.markdown("### Customer-Level Metrics")
         
         # Customer concentration and behavior
-        customer_stats = filtered_df.groupby('customer_name').agg({
+        customer_stats = filtered_df.groupby('customer_name', observed=True).agg({
             'loan_number': 'count',
             'loan_amount': ['sum', 'mean', 'median'],
             'interest_amount': 'sum'
         }).round(0)
         
         customer_stats.columns = ['Total Loans', 'Total Principal', 'Avg Loan Size', 'Median Loan Size', 'Total Interest']
-        customer_stats = customer_stats.sort_values('Total Principal', ascending=False)
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -1405,14 +1403,15 @@ try:
         
         # Top customers detail table
         st.markdown("#### Top 20 Customers by Total Principal")
-        top_20_customers = customer_stats.head(20).reset_index()
+        top_20_customers = customer_stats.nlargest(20, 'Total Principal').reset_index()
         
-        styled_top20 = utils.style_mixed_table(
-            top_20_customers,
-            currency_cols=['Total Principal', 'Avg Loan Size', 'Median Loan Size', 'Total Interest'],
-            int_cols=['Total Loans']
+        st.dataframe(
+            top_20_customers, use_container_width=True, hide_index=True, height=400,
+            column_config=utils.mixed_column_config(
+                currency_cols=['Total Principal', 'Avg Loan Size', 'Median Loan Size', 'Total Interest'],
+                int_cols=['Total Loans']
+            )
         )
-        st.dataframe(styled_top20, use_container_width=True, hide_index=True, height=400)
     
     # ========================================
     # ENHANCED VISUALIZATIONS
@@ -1428,11 +1427,11 @@ try:
         freq='D'
     )
     
-    daily_disbursed = filtered_df.groupby('date_of_disbursement')['loan_amount'].sum().reindex(all_dates, fill_value=0)
+    daily_disbursed = filtered_df.groupby('date_of_disbursement', sort=False)['loan_amount'].sum().reindex(all_dates, fill_value=0)
     cumulative_disbursed = daily_disbursed.cumsum()
     
-    released_df = filtered_df[filtered_df['released'] == 'TRUE']
-    daily_released = released_df.groupby('date_of_release')['loan_amount'].sum().reindex(all_dates, fill_value=0)
+    released_df = filtered_df[filtered_df['released_bool']]
+    daily_released = released_df.groupby('date_of_release', sort=False)['loan_amount'].sum().reindex(all_dates, fill_value=0)
     cumulative_released = daily_released.cumsum()
     
     outstanding_series = cumulative_disbursed - cumulative_released
@@ -1497,12 +1496,12 @@ try:
         last_13_months_df = filtered_df[
             (filtered_df['date_of_disbursement'] >= start_month) &
             (filtered_df['date_of_disbursement'] <= end_month)
-        ].copy()
+        ]
         
         if not last_13_months_df.empty:
             # Group by month
-            last_13_months_df['month_year'] = last_13_months_df['date_of_disbursement'].dt.to_period('M')
-            monthly_trend = last_13_months_df.groupby('month_year').agg({
+            month_year = last_13_months_df['date_of_disbursement'].dt.to_period('M').rename('month_year')
+            monthly_trend = last_13_months_df.groupby(month_year).agg({
                 'loan_amount': 'sum',
                 'loan_number': 'count'
             }).reset_index()
@@ -1590,139 +1589,143 @@ try:
     st.markdown("---")
     st.markdown("## 💰 Earnings vs Expenses - Last 25 Months")
     
-    # Calculate 25-month period
-    end_month_25 = datetime.now()
-    start_month_25 = end_month_25 - relativedelta(months=24)
-    
-    # Load expense data
-    expense_df = data_cache.load_expense_data_with_cache()
-    
-    if not expense_df.empty:
-        expense_df['date'] = pd.to_datetime(expense_df['date'], errors='coerce')
-        expense_df['amount'] = pd.to_numeric(expense_df['amount'], errors='coerce').fillna(0)
-        
-        # Filter expenses for last 25 months
-        expense_25m = expense_df[
-            (expense_df['date'] >= start_month_25) &
-            (expense_df['date'] <= end_month_25)
-        ].copy()
-        
-        # Filter loans released in last 25 months (interest is on release date as per Yearly Breakdown)
-        released_25m = loan_df[
-            (loan_df['date_of_release'] >= start_month_25) &
-            (loan_df['date_of_release'] <= end_month_25) &
-            (loan_df['date_of_release'].notna())
-        ].copy()
-        
-        # Group by month-year
-        expense_25m['month_year'] = expense_25m['date'].dt.to_period('M')
-        released_25m['month_year'] = released_25m['date_of_release'].dt.to_period('M')
-        
-        # Aggregate monthly data
-        monthly_expenses = expense_25m.groupby('month_year')['amount'].sum()
-        monthly_interest = released_25m.groupby('month_year')['interest_amount'].sum()
-        
-        # Create complete month range
-        all_months_25 = pd.period_range(start=pd.Period(start_month_25, freq='M'), end=pd.Period(end_month_25, freq='M'), freq='M')
-        
-        # Reindex to ensure all months present
-        monthly_expenses = monthly_expenses.reindex(all_months_25, fill_value=0)
-        monthly_interest = monthly_interest.reindex(all_months_25, fill_value=0)
-        
-        # Calculate net profit
-        net_profit = monthly_interest - monthly_expenses
-        
-        # Create DataFrame for display
-        earnings_df = pd.DataFrame({
-            'Interest Earned': monthly_interest,
-            'Expenses': monthly_expenses,
-            'Net Profit': net_profit
-        })
-        earnings_df.index = earnings_df.index.astype(str)
+    # The expense query and 25-month aggregation only run when requested
+    show_earnings_vs_expenses = st.toggle(
+        "Show earnings vs expenses",
+        value=False,
+        help="Loads expense data and builds the 25-month comparison on demand"
+    )
+    
+    if show_earnings_vs_expenses:
+        # Calculate 25-month period
+        end_month_25 = datetime.now()
+        start_month_25 = end_month_25 - relativedelta(months=24)
+    
+        # Load expense data
+        expense_df = data_cache.load_expense_data_with_cache()
+    
+        if not expense_df.empty:
+            expense_df['date'] = pd.to_datetime(expense_df['date'], errors='coerce')
+            expense_df['amount'] = pd.to_numeric(expense_df['amount'], errors='coerce').fillna(0)
         
-        # Create combined chart with bars and line
-        fig = go.Figure()
+            # Filter expenses for last 25 months
+            expense_25m = expense_df[
+                (expense_df['date'] >= start_month_25) &
+                (expense_df['date'] <= end_month_25)
+            ]
         
-        # Add Interest Earned bars
-        fig.add_trace(go.Bar(
-            x=earnings_df.index,
-            y=earnings_df['Interest Earned'],
-            name='Interest Earned',
-            marker_color='#10b981',
-            opacity=0.8,
-            hovertemplate='₹%{y:,.0f}<extra></extra>'
-        ))
+            # Filter loans released in last 25 months (interest is on release date as per Yearly Breakdown)
+            released_25m = loan_df[
+                (loan_df['date_of_release'] >= start_month_25) &
+                (loan_df['date_of_release'] <= end_month_25) &
+                (loan_df['date_of_release'].notna())
+            ]
         
-        # Add Expenses bars
-        fig.add_trace(go.Bar(
-            x=earnings_df.index,
-            y=earnings_df['Expenses'],
-            name='Expenses',
-            marker_color='#ef4444',
-            opacity=0.8,
-            hovertemplate='₹%{y:,.0f}<extra></extra>'
-        ))
+            # Aggregate monthly data, grouping on the month periods directly
+            monthly_expenses = expense_25m.groupby(expense_25m['date'].dt.to_period('M'))['amount'].sum()
+            monthly_interest = released_25m.groupby(released_25m['date_of_release'].dt.to_period('M'))['interest_amount'].sum()
         
-        # Add Net Profit line
-        fig.add_trace(go.Scatter(
-            x=earnings_df.index,
-            y=earnings_df['Net Profit'],
-            name='Net Profit',
-            line=dict(color='#3b82f6', width=3, shape='spline'),
-            mode='lines+markers',
-            marker=dict(size=8, symbol='diamond'),
-            yaxis='y2',
-            hovertemplate='₹%{y:,.0f}<extra></extra>'
-        ))
+            # Create complete month range
+            all_months_25 = pd.period_range(start=pd.Period(start_month_25, freq='M'), end=pd.Period(end_month_25, freq='M'), freq='M')
         
-        # Update layout with dual y-axes
-        fig.update_layout(
-            title="25-Month Earnings vs Expenses Trend",
-            xaxis_title="Month",
-            yaxis_title="Amount (₹)",
-            yaxis2=dict(
-                title="Net Profit (₹)",
-                overlaying='y',
-                side='right',
-                showgrid=False
-            ),
-            template='plotly_white',
-            height=500,
-            hovermode='x unified',
-            barmode='group',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            xaxis=dict(tickangle=-45)
-        )
+            # Reindex to ensure all months present
+            monthly_expenses = monthly_expenses.reindex(all_months_25, fill_value=0)
+            monthly_interest = monthly_interest.reindex(all_months_25, fill_value=0)
         
-        st.plotly_chart(fig, use_container_width=True)
+            # Calculate net profit
+            net_profit = monthly_interest - monthly_expenses
         
-        # Summary statistics
-        col_a, col_b, col_c, col_d = st.columns(4)
+            # Create DataFrame for display
+            earnings_df = pd.DataFrame({
+                'Interest Earned': monthly_interest,
+                'Expenses': monthly_expenses,
+                'Net Profit': net_profit
+            })
+            earnings_df.index = earnings_df.index.astype(str)
         
-        with col_a:
-            total_interest_25m = earnings_df['Interest Earned'].sum()
-            st.metric("Total Interest (25M)", f"₹{total_interest_25m/1_000_000:.2f}M")
+            # Create combined chart with bars and line
+            fig = go.Figure()
         
-        with col_b:
-            total_expenses_25m = earnings_df['Expenses'].sum()
-            st.metric("Total Expenses (25M)", f"₹{total_expenses_25m/1_000_000:.2f}M")
+            # Add Interest Earned bars
+            fig.add_trace(go.Bar(
+                x=earnings_df.index,
+                y=earnings_df['Interest Earned'],
+                name='Interest Earned',
+                marker_color='#10b981',
+                opacity=0.8,
+                hovertemplate='₹%{y:,.0f}<extra></extra>'
+            ))
         
-        with col_c:
-            total_profit_25m = earnings_df['Net Profit'].sum()
-            profit_margin = (total_profit_25m / total_interest_25m * 100) if total_interest_25m > 0 else 0
-            st.metric("Total Net Profit (25M)", f"₹{total_profit_25m/1_000_000:.2f}M", f"{profit_margin:.1f}% margin")
+            # Add Expenses bars
+            fig.add_trace(go.Bar(
+                x=earnings_df.index,
+                y=earnings_df['Expenses'],
+                name='Expenses',
+                marker_color='#ef4444',
+                opacity=0.8,
+                hovertemplate='₹%{y:,.0f}<extra></extra>'
+            ))
         
-        with col_d:
-            avg_monthly_profit = earnings_df['Net Profit'].mean()
-            st.metric("Avg Monthly Profit", f"₹{avg_monthly_profit/1_000:.0f}K")
-    else:
-        st.info("No expense data available for analysis")
+            # Add Net Profit line
+            fig.add_trace(go.Scatter(
+                x=earnings_df.index,
+                y=earnings_df['Net Profit'],
+                name='Net Profit',
+                line=dict(color='#3b82f6', width=3, shape='spline'),
+                mode='lines+markers',
+                marker=dict(size=8, symbol='diamond'),
+                yaxis='y2',
+                hovertemplate='₹%{y:,.0f}<extra></extra>'
+            ))
+        
+            # Update layout with dual y-axes
+            fig.update_layout(
+                title="25-Month Earnings vs Expenses Trend",
+                xaxis_title="Month",
+                yaxis_title="Amount (₹)",
+                yaxis2=dict(
+                    title="Net Profit (₹)",
+                    overlaying='y',
+                    side='right',
+                    showgrid=False
+                ),
+                template='plotly_white',
+                height=500,
+                hovermode='x unified',
+                barmode='group',
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1
+                ),
+                xaxis=dict(tickangle=-45)
+            )
+        
+            st.plotly_chart(fig, use_container_width=True)
+        
+            # Summary statistics
+            col_a, col_b, col_c, col_d = st.columns(4)
+        
+            with col_a:
+                total_interest_25m = earnings_df['Interest Earned'].sum()
+                st.metric("Total Interest (25M)", f"₹{total_interest_25m/1_000_000:.2f}M")
+        
+            with col_b:
+                total_expenses_25m = earnings_df['Expenses'].sum()
+                st.metric("Total Expenses (25M)", f"₹{total_expenses_25m/1_000_000:.2f}M")
+        
+            with col_c:
+                total_profit_25m = earnings_df['Net Profit'].sum()
+                profit_margin = (total_profit_25m / total_interest_25m * 100) if total_interest_25m > 0 else 0
+                st.metric("Total Net Profit (25M)", f"₹{total_profit_25m/1_000_000:.2f}M", f"{profit_margin:.1f}% margin")
+        
+            with col_d:
+                avg_monthly_profit = earnings_df['Net Profit'].mean()
+                st.metric("Avg Monthly Profit", f"₹{avg_monthly_profit/1_000:.0f}K")
+        else:
+            st.info("No expense data available for analysis")
     
     # ========================================
     # MATURITY CALENDAR & COLLECTION FUNNEL
@@ -1735,14 +1738,11 @@ try:
         st.markdown("### 📅 Upcoming Loan Maturities")
         
         if 'expiry' in filtered_df.columns:
-            active_with_expiry = filtered_df[
-                (filtered_df['released'] == 'FALSE') &
-                (filtered_df['expiry'].notna())
-            ].copy()
+            active_with_expiry = active_df[active_df['expiry'].notna()].copy()
             
             if not active_with_expiry.empty:
                 active_with_expiry['days_to_maturity'] = (
-                    pd.to_datetime(active_with_expiry['expiry']) - pd.Timestamp.now()
+                    active_with_expiry['expiry'] - pd.Timestamp.now()
                 ).dt.days
                 
                 # Group into weeks
@@ -1756,26 +1756,22 @@ try:
                     right=False
                 )
                 
-                maturity_summary = active_with_expiry.groupby('period').agg({
+                # Keep empty periods: the calendar shows every bucket, even with no loans
+                maturity_summary = active_with_expiry.groupby('period', observed=False).agg({
                     'loan_number': 'count',
                     'pending_loan_amount': 'sum'
                 }).reset_index()
                 
-                styled_maturity = utils.style_mixed_table(
-                    maturity_summary,
-                    currency_cols=['pending_loan_amount'],
-                    int_cols=[]
-                )
-                # Note: 'loan_number' formatted with custom string in column_config
                 st.dataframe(
-                    styled_maturity,
+                    maturity_summary,
                     use_container_width=True,
                     hide_index=True,
-                    column_config={
-                        'period': 'Period',
-                        'loan_number': 'Count',
-                        'pending_loan_amount': 'Amount'
-                    }
+                    column_config=utils.mixed_column_config(
+                        currency_cols=['pending_loan_amount'],
+                        int_cols=['loan_number'],
+                        labels={'period': 'Period', 'loan_number': 'Count',
+                                'pending_loan_amount': 'Amount'}
+                    )
                 )
             else:
                 st.info("No maturity data available")
@@ -1789,7 +1785,7 @@ try:
         
         # Adjusted collected interest (same logic as Health Score)
         total_deposited_funnel = filtered_df['interest_deposited_till_date'].sum()
-        legacy_released_mask_funnel = (filtered_df['released'] == 'TRUE') & (filtered_df['interest_deposited_till_date'] <= 0)
+        legacy_released_mask_funnel = filtered_df['released_bool'] & (filtered_df['interest_deposited_till_date'] <= 0)
         legacy_recovered_funnel = filtered_df.loc[legacy_released_mask_funnel, 'interest_amount'].sum()
         collected_interest = total_deposited_funnel + legacy_recovered_funnel
         
@@ -59,8 +59,7 @@ def prepare_yield_data(df):
         return None
     
     # Ensure datetime types
-    released['date_of_disbursement'] = pd.to_datetime(released['date_of_disbursement'])
-    released['date_of_release'] = pd.to_datetime(released['date_of_release'])
+    utils.ensure_datetime_columns(released, ['date_of_disbursement', 'date_of_release'])
     
     # Calculate days to release
     released['days_to_release'] = (released['date_of_release'] - released['date_of_disbursement']).dt.days
@@ -75,24 +74,42 @@ def prepare_yield_data(df):
     # Primary: Use interest_deposited_till_date (actual PAID interest)
     # Fallback: For released loans with 0/NULL deposited, use interest_amount (charged)
     # This reflects cash-basis performance with legacy data handling
-    from db import calculate_realized_interest
-    released['realized_interest'] = calculate_realized_interest(released)
+    released['realized_interest'] = db.calculate_realized_interest(released)
     
     # Calculate individual annualized yield (for reference, not for averaging)
     released['interest_yield'] = (released['realized_interest'] / released['loan_amount']) * (365 / released['days_to_release']) * 100
     
     # Add time dimensions
-    released['release_year'] = released['date_of_release'].dt.year
+    released['release_year'] = released['date_of_release'].dt.year.astype('int16')
     released['release_month'] = released['date_of_release'].dt.to_period('M')
     released['release_month_str'] = released['date_of_release'].dt.strftime('%b %Y')
     
     return released
 
 
+def summarize_yield_by(df, key, sort=True):
+    """
+    Capital, interest, holding-weighted days and loan count per group,
+    built from one groupby pass instead of one filter per group value.
+    Adds avg_days, portfolio_yield and simple_return (portfolio-level formulas).
+    """
+    summary = (df
+               .assign(weighted_days=df['loan_amount'] * df['days_to_release'])
+               .groupby(key, observed=True, sort=sort)
+               .agg(capital=('loan_amount', 'sum'),
+                    interest=('realized_interest', 'sum'),
+                    weighted_days=('weighted_days', 'sum'),
+                    loan_count=('loan_amount', 'size')))
+    summary['avg_days'] = summary['weighted_days'] / summary['capital']
+    summary['simple_return'] = (summary['interest'] / summary['capital']) * 100
+    summary['portfolio_yield'] = summary['simple_return'] * (365 / summary['avg_days'])
+    return summary
+
+
 # Load data with session state caching
 with st.spinner("Loading loan data..."):
-    raw_df = data_cache.load_loan_data_with_cache()
-    yield_df = prepare_yield_data(raw_df)
+    # Rebuilt only when the loan data is reloaded, not on every rerun
+    yield_df = data_cache.load_derived_loan_data('yield_data', prepare_yield_data)
 
 if yield_df is None or yield_df.empty:
     st.error("⚠️ No released loans found in the database. Cannot perform yield analysis.")
@@ -173,8 +190,8 @@ st.markdown("## ⏱️ Yield by Holding Period")
 st.caption("*Comparison of short-term (<30 days) vs long-term (30+ days) loan performance*")
 
 # Segment the data
-short_term = yield_df[yield_df['days_to_release'] < 30].copy()
-long_term = yield_df[yield_df['days_to_release'] >= 30].copy()
+short_term = yield_df[yield_df['days_to_release'] < 30]
+long_term = yield_df[yield_df['days_to_release'] >= 30]
 
 col1, col2 = st.columns(2)
 
@@ -251,33 +268,19 @@ yield_df['amount_range'] = pd.cut(
     include_lowest=True
 )
 
-# Calculate portfolio-level metrics for each bucket
-amount_range_analysis = []
+# Calculate portfolio-level metrics for each bucket (empty buckets dropped)
+by_bucket = summarize_yield_by(yield_df, 'amount_range')
 
-for bucket in amount_labels:
-    bucket_data = yield_df[yield_df['amount_range'] == bucket].copy()
-    
-    if not bucket_data.empty:
-        bucket_capital = bucket_data['loan_amount'].sum()
-        bucket_interest = bucket_data['realized_interest'].sum()
-        bucket_avg_days = (bucket_data['loan_amount'] * bucket_data['days_to_release']).sum() / bucket_capital
-        bucket_yield = (bucket_interest / bucket_capital) * (365 / bucket_avg_days) * 100
-        bucket_simple_return = (bucket_interest / bucket_capital) * 100
-        bucket_pct = (bucket_capital / total_capital) * 100
-        
-        amount_range_analysis.append({
-            'Loan Amount Range': bucket,
-            'Portfolio Yield (%)': bucket_yield,
-            'Simple Return (%)': bucket_simple_return,
-            'Capital Deployed (₹M)': bucket_capital / 1_000_000,
-            '% of Portfolio': bucket_pct,
-            'Loan Count': len(bucket_data),
-            'Avg Holding (days)': bucket_avg_days,
-            'Total Interest (₹M)': bucket_interest / 1_000_000
-        })
-
-# Create DataFrame
-amount_range_df = pd.DataFrame(amount_range_analysis)
+amount_range_df = pd.DataFrame({
+    'Loan Amount Range': by_bucket.index.astype(str),
+    'Portfolio Yield (%)': by_bucket['portfolio_yield'],
+    'Simple Return (%)': by_bucket['simple_return'],
+    'Capital Deployed (₹M)': by_bucket['capital'] / 1_000_000,
+    '% of Portfolio': (by_bucket['capital'] / total_capital) * 100,
+    'Loan Count': by_bucket['loan_count'],
+    'Avg Holding (days)': by_bucket['avg_days'],
+    'Total Interest (₹M)': by_bucket['interest'] / 1_000_000
+}).reset_index(drop=True)
 
 # Display the table
 styled_amount_range = utils.style_mixed_table(
@@ -349,27 +352,17 @@ st.markdown("## 📅 Yearly Interest Yield Trends")
 st.caption("*Portfolio yield analysis by release year*")
 
 # Calculate portfolio-level yield for each year
-yearly_data = []
-for year in sorted(yield_df['release_year'].unique()):
-    year_loans = yield_df[yield_df['release_year'] == year].copy()
-    
-    year_capital = year_loans['loan_amount'].sum()
-    year_interest = year_loans['realized_interest'].sum()
-    year_avg_days = (year_loans['loan_amount'] * year_loans['days_to_release']).sum() / year_capital
-    year_yield = (year_interest / year_capital) * (365 / year_avg_days) * 100
-    year_simple_return = (year_interest / year_capital) * 100
-    
-    yearly_data.append({
-        'Year': int(year),
-        'Portfolio Yield (%)': year_yield,
-        'Simple Return (%)': year_simple_return,
-        'Total Interest (₹M)': year_interest / 1_000_000,
-        'Total Capital (₹M)': year_capital / 1_000_000,
-        'Loan Count': len(year_loans),
-        'Avg Holding (days)': year_avg_days
-    })
-
-yearly_df = pd.DataFrame(yearly_data)
+by_year = summarize_yield_by(yield_df, 'release_year')
+
+yearly_df = pd.DataFrame({
+    'Year': by_year.index.astype(int),
+    'Portfolio Yield (%)': by_year['portfolio_yield'],
+    'Simple Return (%)': by_year['simple_return'],
+    'Total Interest (₹M)': by_year['interest'] / 1_000_000,
+    'Total Capital (₹M)': by_year['capital'] / 1_000_000,
+    'Loan Count': by_year['loan_count'],
+    'Avg Holding (days)': by_year['avg_days']
+}).reset_index(drop=True)
 
 # Calculate YoY change
 yearly_df['YoY Change (%)'] = yearly_df['Portfolio Yield (%)'].pct_change() * 100
@@ -461,29 +454,20 @@ start_month = end_month - relativedelta(months=11)
 monthly_loans = yield_df[
     (yield_df['date_of_release'] >= start_month) &
     (yield_df['date_of_release'] <= end_month)
-].copy()
+]
 
 if not monthly_loans.empty:
     # Calculate portfolio-level yield for each month
-    monthly_data = []
-    for month in sorted(monthly_loans['release_month'].unique()):
-        month_loans = monthly_loans[monthly_loans['release_month'] == month].copy()
-        
-        month_capital = month_loans['loan_amount'].sum()
-        month_interest = month_loans['realized_interest'].sum()
-        month_avg_days = (month_loans['loan_amount'] * month_loans['days_to_release']).sum() / month_capital
-        month_yield = (month_interest / month_capital) * (365 / month_avg_days) * 100
-        
-        monthly_data.append({
-            'Month': month,
-            'Month Label': str(month),
-            'Portfolio Yield (%)': month_yield,
-            'Total Interest (₹M)': month_interest / 1_000_000,
-            'Total Capital (₹M)': month_capital / 1_000_000,
-            'Loan Count': len(month_loans)
-        })
+    by_month = summarize_yield_by(monthly_loans, 'release_month')
     
-    monthly_df = pd.DataFrame(monthly_data)
+    monthly_df = pd.DataFrame({
+        'Month': by_month.index,
+        'Month Label': by_month.index.astype(str),
+        'Portfolio Yield (%)': by_month['portfolio_yield'],
+        'Total Interest (₹M)': by_month['interest'] / 1_000_000,
+        'Total Capital (₹M)': by_month['capital'] / 1_000_000,
+        'Loan Count': by_month['loan_count']
+    }).reset_index(drop=True)
     
     # Calculate MoM change
     monthly_df['MoM Change (%)'] = monthly_df['Portfolio Yield (%)'].pct_change() * 100
@@ -576,7 +560,7 @@ if not monthly_loans.empty:
     
     # Monthly details table
     st.markdown("### Monthly Details")
-    monthly_display = monthly_df[['Month Label', 'Portfolio Yield (%)', 'Total Interest (₹M)', 'Total Capital (₹M)', 'Loan Count', 'MoM Change (%)']].copy()
+    monthly_display = monthly_df[['Month Label', 'Portfolio Yield (%)', 'Total Interest (₹M)', 'Total Capital (₹M)', 'Loan Count', 'MoM Change (%)']]
     
     st.dataframe(
         monthly_display.style.format({
@@ -599,33 +583,18 @@ st.markdown("## 👥 Yield by Customer Type")
 st.caption("*Portfolio yield comparison: Vyapari vs Private customers*")
 
 if 'customer_type' in yield_df.columns:
-    customer_types = yield_df['customer_type'].unique()
-    
-    customer_analysis = []
-    
-    for ctype in customer_types:
-        ctype_loans = yield_df[yield_df['customer_type'] == ctype].copy()
-        
-        if not ctype_loans.empty:
-            ctype_capital = ctype_loans['loan_amount'].sum()
-            ctype_interest = ctype_loans['realized_interest'].sum()
-            ctype_avg_days = (ctype_loans['loan_amount'] * ctype_loans['days_to_release']).sum() / ctype_capital
-            ctype_yield = (ctype_interest / ctype_capital) * (365 / ctype_avg_days) * 100
-            ctype_simple_return = (ctype_interest / ctype_capital) * 100
-            ctype_pct = (ctype_capital / total_capital) * 100
-            
-            customer_analysis.append({
-                'Customer Type': ctype,
-                'Portfolio Yield (%)': ctype_yield,
-                'Simple Return (%)': ctype_simple_return,
-                'Capital Deployed (₹M)': ctype_capital / 1_000_000,
-                '% of Portfolio': ctype_pct,
-                'Loan Count': len(ctype_loans),
-                'Avg Holding (days)': ctype_avg_days,
-                'Total Interest (₹M)': ctype_interest / 1_000_000
-            })
-    
-    customer_df = pd.DataFrame(customer_analysis)
+    by_type = summarize_yield_by(yield_df, 'customer_type', sort=False)
+    
+    customer_df = pd.DataFrame({
+        'Customer Type': list(by_type.index),
+        'Portfolio Yield (%)': by_type['portfolio_yield'],
+        'Simple Return (%)': by_type['simple_return'],
+        'Capital Deployed (₹M)': by_type['capital'] / 1_000_000,
+        '% of Portfolio': (by_type['capital'] / total_capital) * 100,
+        'Loan Count': by_type['loan_count'],
+        'Avg Holding (days)': by_type['avg_days'],
+        'Total Interest (₹M)': by_type['interest'] / 1_000_000
+    }).reset_index(drop=True)
     
     # Display comparison
     col_ct1, col_ct2 = st.columns(2)
@@ -709,7 +678,7 @@ with st.expander("📋 View Data Quality Checks"):
     
     # Sample calculation breakdown
     st.markdown("### Sample Calculation (Most Recent Loan)")
-    recent_loan = yield_df.sort_values('date_of_release', ascending=False).iloc[0]
+    recent_loan = yield_df.loc[yield_df['date_of_release'].idxmax()]
     
     st.code(f"""
 Sample Loan Calculation:
@@ -73,16 +73,9 @@ try:
         st.stop()
     
     # Data preprocessing
-    num_cols = ["loan_amount", "pending_loan_amount", "interest_amount", "interest_rate", 
-                "gross_wt", "net_wt", "gold_rate", "purity", "valuation", "ltv_given",
-                "interest_deposited_till_date"]
-    
-    for col in num_cols:
-        if col in loan_df.columns:
-            loan_df[col] = pd.to_numeric(loan_df[col], errors="coerce").fillna(0)
-    
-    loan_df["date_of_disbursement"] = pd.to_datetime(loan_df["date_of_disbursement"], errors='coerce')
-    loan_df["date_of_release"] = pd.to_datetime(loan_df["date_of_release"], errors='coerce')
+    # Types are set by the cached loader; this only fills missing values
+    utils.ensure_numeric_columns(loan_df, data_cache.LOAN_NUMERIC_COLS)
+    utils.ensure_datetime_columns(loan_df, ["date_of_disbursement", "date_of_release"])
     loan_df = utils.normalize_customer_data(loan_df)
     
     # ========================================
@@ -91,11 +84,11 @@ try:
     
     # Portfolio Overview
     total_loans = len(loan_df)
-    active_loans = len(loan_df[loan_df['released'] == 'FALSE'])
-    released_loans = len(loan_df[loan_df['released'] == 'TRUE'])
+    released_loans = int(loan_df['released_bool'].sum())
+    active_loans = total_loans - released_loans
     
     total_disbursed = loan_df['loan_amount'].sum()
-    total_outstanding = loan_df[loan_df['released'] == 'FALSE']['pending_loan_amount'].sum()
+    total_outstanding = loan_df.loc[~loan_df['released_bool'], 'pending_loan_amount'].sum()
     
     # Interest Metrics
     released_df = loan_df[loan_df['date_of_release'].notna()].copy()
@@ -119,24 +112,22 @@ try:
     
     # Collection Efficiency
     total_deposited = loan_df['interest_deposited_till_date'].sum()
-    legacy_released_mask = (loan_df['released'] == 'TRUE') & (loan_df['interest_deposited_till_date'] <= 0)
+    legacy_released_mask = loan_df['released_bool'] & (loan_df['interest_deposited_till_date'] <= 0)
     legacy_recovered = loan_df.loc[legacy_released_mask, 'interest_amount'].sum()
     total_collected = total_deposited + legacy_recovered
     expected_interest = total_disbursed * 0.12
     collection_efficiency = (total_collected / expected_interest * 100) if expected_interest > 0 else 0
     
     # LTV Analysis (using CORRECTED LTV calculation)
-    active_df = loan_df[loan_df['released'] == 'FALSE'].copy()
+    active_df = loan_df[~loan_df['released_bool']]
     if len(active_df) > 0:
-        active_df['ltv_correct'] = calculate_correct_ltv(active_df)
-        avg_ltv = active_df['ltv_correct'].mean()
+        avg_ltv = calculate_correct_ltv(active_df).mean()
     else:
         avg_ltv = 0
     
     # Customer Concentration
     if len(active_df) > 0:
-        top_5_concentration = (active_df.nlargest(5, 'pending_loan_amount')['pending_loan_amount'].sum() / 
-                              active_df['pending_loan_amount'].sum() * 100) if active_df['pending_loan_amount'].sum() > 0 else 0
+        top_5_concentration = utils.calculate_top_n_concentration(active_df['pending_loan_amount'], n=5)
     else:
         top_5_concentration = 0
     
@@ -153,7 +144,7 @@ try:
     volume_growth = ((last_3m_volume - prev_3m_volume) / prev_3m_volume * 100) if prev_3m_volume > 0 else 0
     
     # Customer Retention
-    repeat_customers = loan_df.groupby('customer_name')['loan_number'].count()
+    repeat_customers = loan_df.groupby('customer_name', observed=True)['loan_number'].count()
     repeat_rate = (len(repeat_customers[repeat_customers > 1]) / len(repeat_customers) * 100) if len(repeat_customers) > 0 else 0
     
     # Average Loan Size Trend
@@ -782,8 +773,11 @@ try:
     # Calculate yearly metrics
     yearly_data = []
     
+    # Release year extracted once, not once per loop iteration
+    release_years = released_df['date_of_release'].dt.year
+    
     for year in range(2020, 2026):
-        year_released = released_df[released_df['date_of_release'].dt.year == year].copy()
+        year_released = released_df[release_years == year]
         
         if len(year_released) > 0:
             # Loan Book (Total Disbursed)
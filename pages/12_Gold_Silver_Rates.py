@@ -37,6 +37,45 @@ with st.sidebar:
     - **Range**: Sep 2021 - Oct 2025
     """)
 
+
+@st.cache_data(ttl=300, max_entries=8, show_spinner=False)
+def build_rate_chart(chart_data, rate_col, avg_col, title, line_color, avg_color):
+    """
+    Build the rate vs 3-month average line chart.
+    
+    Cached on the chart slice and styling args, so reruns that keep
+    the same time range reuse the figure instead of rebuilding its traces.
+    Eight entries hold both metals for all four time ranges; older figures
+    are evicted, and the TTL drops them once newer rates are imported.
+    """
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=chart_data['rate_date'],
+        y=chart_data[rate_col],
+        name='Hazir Rate',
+        line=dict(color=line_color, width=2),
+        mode='lines'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=chart_data['rate_date'],
+        y=chart_data[avg_col],
+        name='3-Month Average',
+        line=dict(color=avg_color, width=2, dash='dash'),
+        mode='lines'
+    ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title="Date",
+        yaxis_title="Rate (₹)",
+        hovermode='x unified',
+        height=400
+    )
+    return fig
+
+
 # Load data (no caching - fresh load each time)
 try:
     with st.spinner("Loading gold and silver rates..."):
@@ -212,66 +251,22 @@ elif time_range == "Last 1 Year":
 else:  # All Time
     cutoff_date = rates_df['rate_date'].min()
 
-chart_data = rates_df[rates_df['rate_date'] >= cutoff_date].copy()
+chart_data = rates_df[rates_df['rate_date'] >= cutoff_date]
 
 # Gold Price Chart
 st.markdown("#### 🟡 Gold Price Movement")
-fig_gold = go.Figure()
-
-fig_gold.add_trace(go.Scatter(
-    x=chart_data['rate_date'],
-    y=chart_data['ngp_hazir_gold'],
-    name='Hazir Rate',
-    line=dict(color='gold', width=2),
-    mode='lines'
-))
-
-fig_gold.add_trace(go.Scatter(
-    x=chart_data['rate_date'],
-    y=chart_data['gold_3m_avg'],
-    name='3-Month Average',
-    line=dict(color='orange', width=2, dash='dash'),
-    mode='lines'
-))
-
-fig_gold.update_layout(
-    title="Gold Hazir Rate (₹ per 10g)",
-    xaxis_title="Date",
-    yaxis_title="Rate (₹)",
-    hovermode='x unified',
-    height=400
+fig_gold = build_rate_chart(
+    chart_data, 'ngp_hazir_gold', 'gold_3m_avg',
+    title="Gold Hazir Rate (₹ per 10g)", line_color='gold', avg_color='orange'
 )
-
 st.plotly_chart(fig_gold, use_container_width=True)
 
 # Silver Price Chart
 st.markdown("#### ⚪ Silver Price Movement")
-fig_silver = go.Figure()
-
-fig_silver.add_trace(go.Scatter(
-    x=chart_data['rate_date'],
-    y=chart_data['ngp_hazir_silver'],
-    name='Hazir Rate',
-    line=dict(color='silver', width=2),
-    mode='lines'
-))
-
-fig_silver.add_trace(go.Scatter(
-    x=chart_data['rate_date'],
-    y=chart_data['silver_3m_avg'],
-    name='3-Month Average',
-    line=dict(color='gray', width=2, dash='dash'),
-    mode='lines'
-))
-
-fig_silver.update_layout(
-    title="Silver Hazir Rate (₹ per kg)",
-    xaxis_title="Date",
-    yaxis_title="Rate (₹)",
-    hovermode='x unified',
-    height=400
+fig_silver = build_rate_chart(
+    chart_data, 'ngp_hazir_silver', 'silver_3m_avg',
+    title="Silver Hazir Rate (₹ per kg)", line_color='silver', avg_color='gray'
 )
-
 st.plotly_chart(fig_silver, use_container_width=True)
 
 # =============================================================================
@@ -128,6 +128,99 @@ result2 = utils.safe_divide(100, 0, default=0.0)
 print(f"✅ 100 / 10 = {result1}")
 print(f"✅ 100 / 0 (with default) = {result2}")
 
+# Test 13: Monthly pivots match the original pivot_table implementation
+print("\n13. Testing create_monthly_pivot() against pivot_table baseline...")
+
+
+def baseline_monthly_pivot(df, value_col, date_col, agg_func):
+    temp_df = df.copy()
+    utils.add_date_columns(temp_df, date_col)
+    pivot = temp_df.pivot_table(index='month_name', columns='year',
+                                values=value_col, aggfunc=agg_func, fill_value=0)
+    return utils.add_pivot_totals(utils.reindex_by_months(pivot))
+
+
+pivot_data = pd.DataFrame({
+    'loan_number': range(1, 41),
+    'loan_amount': [float(1000 * (i % 7 + 1)) for i in range(40)],
+    'date_of_disbursement': pd.date_range('2023-01-15', periods=40, freq='17D'),
+})
+pivot_data.loc[[3, 11], 'loan_amount'] = np.nan        # NaN amounts are skipped
+pivot_data.loc[25, 'date_of_disbursement'] = pd.NaT    # undated rows are dropped
+# Every amount in one month is NaN: its mean bucket must be 0, not NaN
+nan_month = pivot_data['date_of_disbursement'].dt.to_period('M') == pd.Period('2023-06', 'M')
+pivot_data.loc[nan_month, 'loan_amount'] = np.nan
+
+for value_col, agg_func in [('loan_amount', 'sum'), ('loan_number', 'count'),
+                            ('loan_amount', 'mean')]:
+    expected = baseline_monthly_pivot(pivot_data, value_col, 'date_of_disbursement', agg_func)
+    actual = utils.create_monthly_pivot(pivot_data, value_col,
+                                        date_col='date_of_disbursement', agg_func=agg_func)
+    assert not actual.isna().any().any()
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False,
+                                  check_names=False, check_index_type=False,
+                                  check_column_type=False)
+    print(f"✅ {agg_func}({value_col}) matches pivot_table")
+
+specs = [('loan_amount', 'sum'), ('loan_number', 'count'), ('loan_amount', 'mean')]
+multi = utils.create_monthly_pivots_multi(pivot_data, specs)
+for value_col, agg_func in specs:
+    expected = baseline_monthly_pivot(pivot_data, value_col, 'date_of_disbursement', agg_func)
+    pd.testing.assert_frame_equal(multi[(value_col, agg_func)], expected, check_dtype=False,
+                                  check_names=False, check_index_type=False,
+                                  check_column_type=False)
+print("✅ create_monthly_pivots_multi() matches pivot_table for sum, count and mean")
+
+# Test 14: Top-N concentration edge cases
+print("\n14. Testing calculate_top_n_concentration()...")
+amounts = pd.Series([500.0, 100.0, 300.0, 200.0, 400.0, 50.0, 25.0])
+expected = amounts.nlargest(5).sum() / amounts.sum() * 100
+assert abs(utils.calculate_top_n_concentration(amounts, n=5) - expected) < 1e-9
+assert utils.calculate_top_n_concentration(amounts, n=7) == 100.0     # n == len
+assert utils.calculate_top_n_concentration(amounts, n=20) == 100.0    # n > len
+assert utils.calculate_top_n_concentration(pd.Series([0.0, 0.0, 0.0])) == 0.0
+assert utils.calculate_top_n_concentration(pd.Series([], dtype='float64')) == 0.0
+with_nan = pd.Series([500.0, np.nan, 100.0, 300.0, np.nan, 200.0, 400.0, 50.0])
+expected = with_nan.nlargest(5).sum() / with_nan.sum() * 100
+assert abs(utils.calculate_top_n_concentration(with_nan, n=5) - expected) < 1e-9
+assert utils.calculate_top_n_concentration(pd.Series([np.nan, np.nan])) == 0.0
+print("✅ Top-N concentration matches nlargest() (n >= len, zero total, NaN input)")
+
+# Test 15: Released flag normalization (same as the original == 'TRUE' check)
+print("\n15. Testing normalize_released() and released_bool...")
+raw_released = pd.Series(['TRUE', 'true', 'True', ' TRUE', 'TRUE ', 'FALSE', 'false',
+                          'no', np.nan, None, True, False, 1], dtype='object')
+baseline_released = raw_released.apply(
+    lambda x: str(x).upper() if isinstance(x, str) else ('TRUE' if x is True else 'FALSE')
+)
+released = utils.normalize_released(raw_released)
+assert released.tolist() == baseline_released.tolist()
+assert released.eq('TRUE').tolist() == [True, True, True, False, False, False, False,
+                                        False, False, False, True, False, False]
+assert utils.normalize_released(pd.Series([True, False])).tolist() == ['TRUE', 'FALSE']
+assert utils.normalize_released(pd.Series([np.nan, np.nan])).tolist() == ['FALSE', 'FALSE']
+assert utils.normalize_released(pd.Series([np.nan, None], dtype='object')).tolist() == ['FALSE', 'FALSE']
+assert utils.normalize_released(pd.Series([True, None])).tolist() == ['TRUE', 'FALSE']  # no strings
+assert utils.normalize_released(pd.Series([1, 0])).tolist() == ['FALSE', 'FALSE']      # int column
+
+released_df = utils.normalize_customer_data(pd.DataFrame({'released': raw_released}))
+assert released_df['released_bool'].tolist() == (baseline_released == 'TRUE').tolist()
+print("✅ Case, whitespace and NaN handled like the original == 'TRUE' check")
+
+# Test 16: column_config formats match style_mixed_table
+print("\n16. Testing mixed_column_config()...")
+column_config = utils.mixed_column_config(
+    currency_cols=['Outstanding (₹)'], pct_cols=['LTV (%)'], int_cols=['Age (Days)'],
+    float_cols=['Ratio'], labels={'Age (Days)': 'Age', 'Customer': 'Name'}
+)
+formats = {col: cfg['type_config']['format'] for col, cfg in column_config.items()
+           if isinstance(cfg, dict)}
+assert formats == {'Outstanding (₹)': '₹%,.0f', 'LTV (%)': '%.2f%%',
+                   'Age (Days)': '%,d', 'Ratio': '%.2f'}
+assert column_config['Age (Days)']['label'] == 'Age'
+assert column_config['Customer'] == 'Name'
+print("✅ Currency keeps ₹ with grouping and no decimals; ints keep grouping")
+
 print("\n" + "=" * 70)
 print("ALL TESTS PASSED! ✅")
 print("=" * 70)
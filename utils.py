@@ -24,6 +24,11 @@ except ImportError:
     SCIPY_AVAILABLE = False
 
 
+# Calendar month labels in order (Jan..Dec), shared by all monthly pivots
+MONTH_COLS = [calendar.month_abbr[i] for i in range(1, 13)]
+MONTH_ABBR_BY_NUMBER = dict(enumerate(MONTH_COLS, start=1))
+
+
 # ============================================================================
 # 1. DATA LOADING & CACHING
 # ============================================================================
@@ -79,6 +84,57 @@ def invalidate_cache(cache_keys):
 # 2. DATA TRANSFORMATIONS
 # ============================================================================
 
+def ensure_datetime_columns(df, columns):
+    """
+    Convert columns to datetime64, skipping ones that already are.
+    Modifies DataFrame in-place.
+    
+    Cached loan data is already typed, so on reruns this is a cheap dtype
+    check instead of re-parsing every value with pd.to_datetime.
+    
+    Args:
+        df (pd.DataFrame): DataFrame to modify
+        columns (list): Date column names (missing columns are ignored)
+    
+    Returns:
+        pd.DataFrame: Modified DataFrame
+    
+    Example:
+        ensure_datetime_columns(loan_df, ['date_of_disbursement', 'date_of_release'])
+    """
+    for col in columns:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def ensure_numeric_columns(df, columns, fill_value=0):
+    """
+    Convert columns to numeric and fill missing values, skipping work
+    for columns that are already numeric without NaNs.
+    Modifies DataFrame in-place.
+    
+    Args:
+        df (pd.DataFrame): DataFrame to modify
+        columns (list): Numeric column names (missing columns are ignored)
+        fill_value: Value used for non-numeric / missing entries
+    
+    Returns:
+        pd.DataFrame: Modified DataFrame
+    
+    Example:
+        ensure_numeric_columns(loan_df, ['loan_amount', 'pending_loan_amount'])
+    """
+    for col in columns:
+        if col not in df.columns:
+            continue
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        if df[col].hasnans:
+            df[col] = df[col].fillna(fill_value)
+    return df
+
+
 def add_date_columns(df, date_col='date_of_disbursement', prefix=''):
     """
     Add year, month, month_name, and day columns from a date column.
@@ -97,24 +153,56 @@ def add_date_columns(df, date_col='date_of_disbursement', prefix=''):
         add_date_columns(loan_df, 'date_of_release', prefix='release_')
     """
     # Ensure datetime type
-    df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+    ensure_datetime_columns(df, [date_col])
     
     # Extract components
     df[f'{prefix}year'] = df[date_col].dt.year
     df[f'{prefix}month'] = df[date_col].dt.month
-    df[f'{prefix}month_name'] = df[f'{prefix}month'].map(
-        lambda m: calendar.month_abbr[int(m)] if pd.notna(m) else None
-    )
+    # Dict lookup (1 -> 'Jan', ...); missing months stay NaN
+    df[f'{prefix}month_name'] = df[f'{prefix}month'].map(MONTH_ABBR_BY_NUMBER)
     df[f'{prefix}day'] = df[date_col].dt.day
     
     return df
 
 
+def normalize_released(released):
+    """
+    Normalize a 'released' column to 'TRUE'/'FALSE' strings.
+    
+    Strings are upper-cased (not stripped), True maps to 'TRUE' and any
+    other non-string (False, NaN, None, numbers) maps to 'FALSE', so
+    `== 'TRUE'` gives the same answer it always has.
+    
+    Args:
+        released (pd.Series): Raw released flags from the database
+    
+    Returns:
+        pd.Series: 'TRUE'/'FALSE' strings aligned with released
+    
+    Example:
+        loan_df['released'] = normalize_released(loan_df['released'])
+        loan_df['released_bool'] = loan_df['released'].eq('TRUE')
+    """
+    if pd.api.types.is_bool_dtype(released):
+        return pd.Series(np.where(released, 'TRUE', 'FALSE'), index=released.index)
+    
+    # .str only works when some elements are strings, so upper-case just those;
+    # the rest (bools, None, NaN, 0/1 ints) are released only if they are True
+    released = released.astype('object')
+    is_str = released.map(lambda x: isinstance(x, str)).astype(bool)
+    result = released.map(lambda x: 'TRUE' if x is True else 'FALSE')
+    result[is_str] = released[is_str].str.upper()
+    return result
+
+
 def normalize_customer_data(df):
     """
     Normalize customer-related columns to consistent formats.
     Modifies DataFrame in-place.
     
+    Also adds a boolean 'released_bool' column so outstanding/released
+    filters can use a plain mask instead of string comparisons.
+    
     Args:
         df (pd.DataFrame): DataFrame with customer columns
     
@@ -124,13 +212,17 @@ def normalize_customer_data(df):
     Example:
         normalize_customer_data(loan_df)
     """
-    if 'customer_type' in df.columns:
+    # A categorical customer_type was already title-cased by the loader
+    if 'customer_type' in df.columns and not isinstance(df['customer_type'].dtype, pd.CategoricalDtype):
         df['customer_type'] = df['customer_type'].str.title()
     
-    if 'released' in df.columns:
-        df['released'] = df['released'].apply(
-            lambda x: str(x).upper() if isinstance(x, str) else ('TRUE' if x is True else 'FALSE')
-        )
+    # Already normalized by the data_cache loader (category + released_bool)
+    if 'released' in df.columns and isinstance(df['released'].dtype, pd.CategoricalDtype):
+        if 'released_bool' not in df.columns:
+            df['released_bool'] = df['released'].eq('TRUE')
+    elif 'released' in df.columns:
+        df['released'] = normalize_released(df['released'])
+        df['released_bool'] = df['released'].eq('TRUE')
     
     return df
 
@@ -151,8 +243,7 @@ def calculate_holding_period(df, start_col='date_of_disbursement', end_col='date
     Example:
         calculate_holding_period(released_df)
     """
-    df[start_col] = pd.to_datetime(df[start_col], errors='coerce')
-    df[end_col] = pd.to_datetime(df[end_col], errors='coerce')
+    ensure_datetime_columns(df, [start_col, end_col])
     df['days_to_release'] = (df[end_col] - df[start_col]).dt.days
     return df
 
@@ -257,6 +348,35 @@ def calculate_weighted_average_days(df, amount_col='loan_amount', days_col='days
     return weighted_sum / total_amount
 
 
+def calculate_top_n_concentration(values, n=5):
+    """
+    Calculate the share of the total held by the n largest values.
+    
+    Uses np.partition (linear time) to pick the top n instead of sorting
+    the whole column.
+    
+    Args:
+        values (pd.Series or array-like): Amounts (e.g. pending_loan_amount)
+        n (int): Number of largest values to include (NaN values are ignored)
+    
+    Returns:
+        float: Concentration percentage (0.0 if the total is not positive)
+    
+    Example:
+        top_5_pct = calculate_top_n_concentration(active_df['pending_loan_amount'])
+    """
+    arr = np.asarray(values, dtype='float64')
+    # Skip NaN like nlargest()/sum() do; np.partition would rank NaN as largest
+    arr = arr[~np.isnan(arr)]
+    total = arr.sum()
+    
+    if total <= 0:
+        return 0.0
+    
+    top = np.partition(arr, -n)[-n:] if len(arr) > n else arr
+    return top.sum() / total * 100
+
+
 def calculate_yoy_change(pivot):
     """
     Calculate year-over-year percentage change for pivot tables.
@@ -271,9 +391,13 @@ def calculate_yoy_change(pivot):
     Example:
         yoy_change = calculate_yoy_change(disbursed_pivot)
     """
-    yoy = pivot.pct_change(axis=1) * 100
-    yoy.replace([np.inf, -np.inf], np.nan, inplace=True)
-    return yoy
+    # Single NumPy pass: NaN where the previous year is zero (no inf cleanup)
+    values = pivot.to_numpy(dtype='float64')
+    prev = values[:, :-1]
+    yoy = np.full_like(values, np.nan)
+    np.divide(values[:, 1:] - prev, prev, out=yoy[:, 1:], where=prev != 0)
+    yoy *= 100
+    return pd.DataFrame(yoy, index=pivot.index, columns=pivot.columns)
 
 
 def calculate_mom_change(pivot):
@@ -291,10 +415,15 @@ def calculate_mom_change(pivot):
         mom_change = calculate_mom_change(monthly_pivot)
     """
     # Exclude 'Total' row if present
-    data_rows = pivot.index != 'Total'
-    mom = pivot.loc[data_rows].pct_change(axis=0) * 100
-    mom.replace([np.inf, -np.inf], np.nan, inplace=True)
-    return mom
+    data = pivot.loc[pivot.index != 'Total']
+    
+    # Same NumPy pass as calculate_yoy_change, down the rows instead
+    values = data.to_numpy(dtype='float64')
+    prev = values[:-1]
+    mom = np.full_like(values, np.nan)
+    np.divide(values[1:] - prev, prev, out=mom[1:], where=prev != 0)
+    mom *= 100
+    return pd.DataFrame(mom, index=data.index, columns=data.columns)
 
 
 # ============================================================================
@@ -302,7 +431,7 @@ def calculate_mom_change(pivot):
 # ============================================================================
 
 def create_monthly_pivot(df, value_col, date_col='date_of_disbursement', 
-                        agg_func='sum', add_totals=True):
+                        agg_func='sum', add_totals=True, month_cols=MONTH_COLS):
     """
     Create standardized Month (rows) × Year (columns) pivot table.
     
@@ -312,6 +441,7 @@ def create_monthly_pivot(df, value_col, date_col='date_of_disbursement',
         date_col (str): Date column to extract year/month from
         agg_func (str or callable): Aggregation function ('sum', 'count', 'mean', etc.)
         add_totals (bool): Whether to add Total row and column
+        month_cols (list): Row labels for months 1-12 (default: MONTH_COLS)
     
     Returns:
         pd.DataFrame: Pivot table with months as rows, years as columns
@@ -319,27 +449,97 @@ def create_monthly_pivot(df, value_col, date_col='date_of_disbursement',
     Example:
         pivot = create_monthly_pivot(loan_df, 'loan_amount', agg_func='sum')
     """
-    # Prepare data
-    temp_df = df.copy()
-    add_date_columns(temp_df, date_col)
-    
-    # Create pivot
-    pivot = temp_df.pivot_table(
-        index='month_name',
-        columns='year',
-        values=value_col,
-        aggfunc=agg_func,
-        fill_value=0
-    )
+    spec = (value_col, agg_func)
+    pivots = create_monthly_pivots_multi(df, [spec], date_col=date_col,
+                                         add_totals=add_totals,
+                                         month_cols=month_cols)
+    return pivots[spec]
+
+
+def create_monthly_pivots_multi(df, specs, date_col='date_of_disbursement',
+                                add_totals=True, month_cols=MONTH_COLS):
+    """
+    Create several Month × Year pivot tables from a single groupby pass.
+    
+    Use this instead of calling create_monthly_pivot() repeatedly on the same
+    frame (e.g. amount sum and loan count), so the grouping is built only once.
     
-    # Reorder months
-    pivot = reindex_by_months(pivot)
+    Args:
+        df (pd.DataFrame): Source DataFrame
+        specs (list): List of (value_col, agg_func) tuples
+        date_col (str): Date column to extract year/month from
+        add_totals (bool): Whether to add Total row and column to each pivot
+        month_cols (list): Row labels for months 1-12 (default: MONTH_COLS)
     
-    # Add totals
-    if add_totals:
-        pivot = add_pivot_totals(pivot)
+    Returns:
+        dict: {(value_col, agg_func): pd.DataFrame} pivot tables
     
-    return pivot
+    Example:
+        pivots = create_monthly_pivots_multi(
+            disbursed_df, [('loan_amount', 'sum'), ('loan_number', 'count')]
+        )
+        amount_pivot = pivots[('loan_amount', 'sum')]
+        qty_pivot = pivots[('loan_number', 'count')]
+    """
+    # Compact integer keys (int16 year, int8 month) for rows with a valid date
+    dates = pd.to_datetime(df[date_col], errors='coerce')
+    valid = dates.notna()
+    dates = dates[valid]
+    years = dates.dt.year.to_numpy(dtype='int16')
+    months = dates.dt.month.to_numpy(dtype='int8')
+    
+    # Flat (month, year) bucket code per row: sum/count become a single
+    # np.bincount over these codes, with no hash-based groupby
+    year_labels = np.unique(years)
+    n_years = len(year_labels)
+    codes = (months.astype(np.intp) - 1) * n_years + np.searchsorted(year_labels, years)
+    
+    grouped = None
+    pivots = {}
+    for i, spec in enumerate(specs):
+        value_col, agg_func = spec
+        values = df.loc[valid, value_col]
+        
+        if agg_func in ('sum', 'count'):
+            if agg_func == 'sum':
+                arr = values.to_numpy(dtype='float64', na_value=np.nan)
+                present = ~np.isnan(arr)
+                flat = np.bincount(codes[present], weights=arr[present],
+                                   minlength=12 * n_years)
+                if pd.api.types.is_integer_dtype(values):
+                    flat = flat.astype('int64')
+            else:
+                flat = np.bincount(codes[values.notna().to_numpy()],
+                                   minlength=12 * n_years)
+            pivot = pd.DataFrame(flat.reshape(12, n_years), index=month_cols,
+                                 columns=pd.Index(year_labels, name='year'))
+        else:
+            # Other aggregations: one groupby shared by all remaining specs
+            if grouped is None:
+                value_cols = list(dict.fromkeys(col for col, _ in specs))
+                temp_df = df.loc[valid, value_cols].assign(year=years, month=months)
+                grouped = temp_df.groupby(['month', 'year'], sort=False,
+                                          observed=True).agg(
+                    **{f'agg_{j}': s for j, s in enumerate(specs)
+                       if s[1] not in ('sum', 'count')}
+                )
+            
+            # All 12 months in calendar order, then label them in one step;
+            # empty buckets (e.g. mean of all-NaN values) become 0 like sum/count
+            pivot = (grouped[f'agg_{i}']
+                     .unstack('year', fill_value=0)
+                     .reindex(index=range(1, 13), columns=year_labels,
+                              fill_value=0)
+                     .fillna(0))
+            pivot.index = month_cols
+        
+        # Add totals
+        if add_totals:
+            pivot = add_pivot_totals(pivot)
+        
+        pivots[spec] = pivot
+    
+    return pivots
 
 
 def add_pivot_totals(pivot):
@@ -378,8 +578,7 @@ def reindex_by_months(pivot):
     Example:
         ordered_pivot = reindex_by_months(pivot)
     """
-    month_order = [calendar.month_abbr[i] for i in range(1, 13)]
-    return pivot.reindex(index=month_order, fill_value=0)
+    return pivot.reindex(index=MONTH_COLS, fill_value=0)
 
 
 # ============================================================================
@@ -496,6 +695,45 @@ def style_mixed_table(df, currency_cols=None, pct_cols=None,
             }]))
 
 
+def mixed_column_config(currency_cols=None, pct_cols=None,
+                        int_cols=None, float_cols=None, labels=None):
+    """
+    st.dataframe column_config equivalent of style_mixed_table().
+    
+    Pass the raw DataFrame with this config: Streamlit formats the numbers
+    client-side with the same display as the Styler (₹123,456, 1,234, 12.34%),
+    so no Styler/HTML pass runs over every cell.
+    
+    Args:
+        currency_cols (list): Columns to format as currency
+        pct_cols (list): Columns to format as percentages
+        int_cols (list): Columns to format as integers
+        float_cols (list): Columns to format as floats with 2 decimals
+        labels (dict): Optional column name -> display label
+    
+    Returns:
+        dict: column name -> st.column_config column
+    
+    Example:
+        st.dataframe(
+            df, hide_index=True,
+            column_config=mixed_column_config(currency_cols=['Outstanding (₹)'], int_cols=['Active Loans'])
+        )
+    """
+    labels = labels or {}
+    formats = {}
+    formats.update({col: '₹%,.0f' for col in currency_cols or []})
+    formats.update({col: '%.2f%%' for col in pct_cols or []})
+    formats.update({col: '%,d' for col in int_cols or []})
+    formats.update({col: '%.2f' for col in float_cols or []})
+    
+    config = {col: st.column_config.NumberColumn(labels.get(col), format=fmt)
+              for col, fmt in formats.items()}
+    for col, label in labels.items():
+        config.setdefault(col, label)
+    return config
+
+
 # ============================================================================
 # 6. UI COMPONENTS (FILTERS)
 # ============================================================================